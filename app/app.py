@@ -1,35 +1,47 @@
-from pathlib import Path
-import pandas as pd
+import time
+
+_T0 = time.perf_counter()
+
 import streamlit as st
-import altair as alt
+
+from manifest import (
+    ENTRY_FILES,
+    MANIFEST_PATH,
+    build_month_entry,
+    fingerprint,
+    infer_months,
+    is_fresh,
+    load_manifest,
+    month_files,
+)
+
+# pandas y altair se importan dentro de las funciones que los usan:
+# el arranque solo lee el manifest (JSON pequeño)
 
 st.set_page_config(page_title="NYC Taxi Demand", layout="wide")
 
-DATA_PROCESSED = Path("data/processed")
-DATA_RAW = Path("data/raw")
-REPORTS = Path("reports")
 
+# Todas las cachés reciben la huella del fichero como argumento:
+# si el fichero cambia en disco, cambia la clave y se recarga sin reiniciar el proceso.
+# max_entries acota la memoria: las entradas de huellas viejas se expulsan.
+
+@st.cache_data(max_entries=2)
+def load_manifest_cached(manifest_fp):
+    return load_manifest()
 
-def infer_months():
-    months = []
-    for p in DATA_PROCESSED.glob("lgbm_pred_*.parquet"):
-        months.append(p.stem.replace("lgbm_pred_", ""))
-    months = sorted(set(months))
-    return months if months else ["2024-01"]
 
+@st.cache_data(max_entries=4)
+def load_month_entry(month: str, fps: dict):
+    # Camino lento: solo si el manifest no existe o está desactualizado
+    return build_month_entry(month)
 
-@st.cache_data
-def load_zones():
-    path = DATA_RAW / "taxi_zone_lookup.csv"
-    df = pd.read_csv(path)
-    df = df.rename(columns={"LocationID": "zone_id", "Zone": "zone_name"})
-    return df
 
+@st.cache_data(max_entries=2)
+def load_preds(month: str, preds_fp):
+    import pandas as pd
 
-@st.cache_data
-def load_preds(month: str):
-    path = DATA_PROCESSED / f"lgbm_pred_{month}.parquet"
-    if not path.exists():
+    path = month_files(month)["preds"]
+    if preds_fp is None:
         st.error(f"No existe {path}. Ejecuta antes: python src/models/train_lightgbm.py")
         st.stop()
 
@@ -41,17 +53,23 @@ def load_preds(month: str):
         st.error(f"Faltan columnas en pred parquet: {missing}. Columnas: {list(df.columns)}")
         st.stop()
 
+    df = df[["zone_id", "datetime_hour", "pickups", "pred"]].copy()
+    df["zone_id"] = df["zone_id"].astype(int)
     df["datetime_hour"] = pd.to_datetime(df["datetime_hour"])
     return df.sort_values(["zone_id", "datetime_hour"]).reset_index(drop=True)
 
 
-@st.cache_data
-def load_errors(month: str):
-    z_path = REPORTS / f"errors_by_zone_{month}.csv"
-    h_path = REPORTS / f"errors_by_hour_{month}.csv"
-    z = pd.read_csv(z_path) if z_path.exists() else None
-    h = pd.read_csv(h_path) if h_path.exists() else None
-    return z, h
+@st.cache_data(max_entries=16)
+def load_zone_preds(month: str, zone_id: int, preds_fp):
+    preds = load_preds(month, preds_fp)
+    return preds[preds["zone_id"] == zone_id].reset_index(drop=True)
+
+
+@st.cache_data(max_entries=8)
+def load_errors_csv(path: str, fp):
+    import pandas as pd
+
+    return pd.read_csv(path) if fp is not None else None
 
 
 def mae_rmse(y_true, y_pred):
@@ -62,107 +80,119 @@ def mae_rmse(y_true, y_pred):
 
 st.title("DS NYC Taxi Demand Forecasting")
 
-months = infer_months()
+manifest = load_manifest_cached(fingerprint(MANIFEST_PATH))
+# Los meses salen del manifest (sin glob en cada rerun); solo sin manifest se
+# recorre data/processed. Un mes nuevo aparece tras: python app/manifest.py
+if manifest and manifest["months"]:
+    months = sorted(manifest["months"])
+else:
+    months = infer_months() or ["2024-01"]
 month = st.sidebar.selectbox("Month", months, index=0)
 
-zones_lookup = load_zones()
-preds = load_preds(month)
-errors_zone, errors_hour = load_errors(month)
-
-# --- merge nombre zona (robusto) ---
-preds = preds.merge(
-    zones_lookup[["zone_id", "Borough", "zone_name", "service_zone"]],
-    on="zone_id",
-    how="left",
-    suffixes=("", "_lk"),
-)
-
-
-if "zone_name" not in preds.columns:
-    for cand in ["zone_name_lk", "zone_name_x", "zone_name_y", "Zone", "zone"]:
-        if cand in preds.columns:
-            preds["zone_name"] = preds[cand]
-            break
-
-if "Borough" not in preds.columns:
-    for cand in ["Borough_lk", "Borough_x", "Borough_y", "borough"]:
-        if cand in preds.columns:
-            preds["Borough"] = preds[cand]
-            break
-
-# (Opcional) debug de rango temporal 
-# st.sidebar.write("min dt:", preds["datetime_hour"].min(), "max dt:", preds["datetime_hour"].max())
-
-# Sidebar: seleccionar zona
-zone_options = (
-    preds[["zone_id", "Borough", "zone_name"]]
-    .drop_duplicates()
-    .sort_values(["Borough", "zone_name"])
-)
+files = month_files(month)
+fps = {k: fingerprint(p) for k, p in files.items()}
+entry_fps = {k: fps[k] for k in ENTRY_FILES}
+
+entry = manifest["months"].get(month) if manifest else None
+if is_fresh(entry, entry_fps):
+    manifest_status = "fresh"
+else:
+    manifest_status = "stale" if entry is not None else "missing"
+    if fps["preds"] is None:
+        st.error(f"No existe {files['preds']}. Ejecuta antes: python src/models/train_lightgbm.py")
+        st.stop()
+    entry = load_month_entry(month, entry_fps)
+    st.sidebar.caption("Manifest desactualizado. Ejecuta: python app/manifest.py")
 
-zone_label_map = {
-    int(r.zone_id): f"{int(r.zone_id)} — {r.Borough} — {r.zone_name}"
-    for _, r in zone_options.iterrows()
-}
+zone_label_map = {int(z): label for z, label in entry["zones"]}
 
 selected_zone = st.sidebar.selectbox(
     "Zone",
     options=list(zone_label_map.keys()),
     format_func=lambda z: zone_label_map[z],
+    index=None,
+    placeholder="Select a zone",
 )
 
-dfz = preds[preds["zone_id"] == selected_zone].copy()
-
 # KPIs
-overall_mae, overall_rmse = mae_rmse(preds["pickups"], preds["pred"])
-zone_mae, zone_rmse = mae_rmse(dfz["pickups"], dfz["pred"])
-
+kpis = entry["kpis"]
 c1, c2, c3, c4 = st.columns(4)
-c1.metric("Overall MAE", f"{overall_mae:.3f}")
-c2.metric("Overall RMSE", f"{overall_rmse:.3f}")
-c3.metric("Zone MAE", f"{zone_mae:.3f}")
-c4.metric("Zone RMSE", f"{zone_rmse:.3f}")
+c1.metric("Overall MAE", f"{kpis['mae']:.3f}")
+c2.metric("Overall RMSE", f"{kpis['rmse']:.3f}")
+zone_mae_slot = c3.empty()
+zone_rmse_slot = c4.empty()
+zone_mae_slot.metric("Zone MAE", "—")
+zone_rmse_slot.metric("Zone RMSE", "—")
+
+# _T0 se reinicia en cada rerun: guardamos solo la primera medida de la sesión
+run_first_render_ms = (time.perf_counter() - _T0) * 1000
+first_render_ms = st.session_state.setdefault("first_render_ms", run_first_render_ms)
 
 st.subheader("Actual vs Predicted (hourly)")
 
-# Eje X: mostrar día + hora para evitar “06 AM / 06 PM” repetido sin fecha
-x_axis = alt.Axis(format="%d %b %H:%M", labelAngle=-45, tickCount=10)
-
-chart = (
-    alt.Chart(dfz)
-    .transform_fold(["pickups", "pred"], as_=["series", "value"])
-    .mark_line()
-    .encode(
-        x=alt.X("datetime_hour:T", title="Datetime (hour)", axis=x_axis),
-        y=alt.Y("value:Q", title="Pickups"),
-        color=alt.Color("series:N", title=""),
-        tooltip=[
-            alt.Tooltip("datetime_hour:T", title="Datetime"),
-            alt.Tooltip("series:N", title="Series"),
-            alt.Tooltip("value:Q", title="Value", format=",.2f"),
-        ],
+if selected_zone is None:
+    st.info("Selecciona una zona en la barra lateral para cargar la serie.")
+else:
+    import altair as alt
+
+    dfz = load_zone_preds(month, selected_zone, fps["preds"])
+
+    zone_mae, zone_rmse = mae_rmse(dfz["pickups"], dfz["pred"])
+    zone_mae_slot.metric("Zone MAE", f"{zone_mae:.3f}")
+    zone_rmse_slot.metric("Zone RMSE", f"{zone_rmse:.3f}")
+
+    # Eje X: mostrar día + hora para evitar “06 AM / 06 PM” repetido sin fecha
+    x_axis = alt.Axis(format="%d %b %H:%M", labelAngle=-45, tickCount=10)
+
+    chart = (
+        alt.Chart(dfz)
+        .transform_fold(["pickups", "pred"], as_=["series", "value"])
+        .mark_line()
+        .encode(
+            x=alt.X("datetime_hour:T", title="Datetime (hour)", axis=x_axis),
+            y=alt.Y("value:Q", title="Pickups"),
+            color=alt.Color("series:N", title=""),
+            tooltip=[
+                alt.Tooltip("datetime_hour:T", title="Datetime"),
+                alt.Tooltip("series:N", title="Series"),
+                alt.Tooltip("value:Q", title="Value", format=",.2f"),
+            ],
+        )
+        .properties(height=320)
     )
-    .properties(height=320)
-)
 
-st.altair_chart(chart, width="stretch")
+    st.altair_chart(chart, width="stretch")
 
 st.subheader("Error analysis")
-colA, colB = st.columns(2)
-
-with colA:
-    st.markdown("### Top zones by MAE (test)")
-    if errors_zone is not None:
-        top = errors_zone.sort_values("mae", ascending=False).head(15)
-        st.dataframe(top, width="stretch")
-    else:
-        st.info("No encuentro reports/errors_by_zone_*.csv. Ejecuta evaluate_errors_by_zone.py")
-
-with colB:
-    st.markdown("### Worst (day_of_week, hour) by MAE")
-    if errors_hour is not None:
-        worst = errors_hour.sort_values("mae", ascending=False).head(15)
-        st.dataframe(worst, width="stretch")
-    else:
-        st.info("No encuentro reports/errors_by_hour_*.csv. Ejecuta evaluate_errors_by_zone.py")
 
+# st.tabs ejecuta todas las pestañas en cada rerun; con un toggle los CSV
+# solo se leen cuando el usuario abre la sección
+if st.toggle("Show error tables", value=False):
+    errors_zone = load_errors_csv(str(files["errors_zone"]), fps["errors_zone"])
+    errors_hour = load_errors_csv(str(files["errors_hour"]), fps["errors_hour"])
+
+    colA, colB = st.columns(2)
+
+    with colA:
+        st.markdown("### Top zones by MAE (test)")
+        if errors_zone is not None:
+            top = errors_zone.sort_values("mae", ascending=False).head(15)
+            st.dataframe(top, width="stretch")
+        else:
+            st.info("No encuentro reports/errors_by_zone_*.csv. Ejecuta evaluate_errors_by_zone.py")
+
+    with colB:
+        st.markdown("### Worst (day_of_week, hour) by MAE")
+        if errors_hour is not None:
+            worst = errors_hour.sort_values("mae", ascending=False).head(15)
+            st.dataframe(worst, width="stretch")
+        else:
+            st.info("No encuentro reports/errors_by_hour_*.csv. Ejecuta evaluate_errors_by_zone.py")
+
+total_ms = (time.perf_counter() - _T0) * 1000
+st.divider()
+st.caption(
+    f"Time to first render: {first_render_ms:.0f} ms · "
+    f"this run: {run_first_render_ms:.0f} ms to KPIs, {total_ms:.0f} ms total · "
+    f"manifest: {manifest_status}"
+)
@@ -0,0 +1,128 @@
+"""Manifest precalculado para el arranque rápido del dashboard.
+
+Guarda por mes: KPIs globales, lista de zonas con su etiqueta y las huellas
+(tamaño + mtime) de los ficheros de los que salen, para que la app pueda
+arrancar sin leer el parquet de predicciones ni los CSV de errores.
+
+Uso (desde la raíz del repo, después de evaluate_errors_by_zone.py):
+    python app/manifest.py
+"""
+import json
+import os
+from pathlib import Path
+
+DATA_PROCESSED = Path("data/processed")
+DATA_RAW = Path("data/raw")
+REPORTS = Path("reports")
+
+MANIFEST_PATH = DATA_PROCESSED / "app_manifest.json"
+MANIFEST_VERSION = 1
+
+# La entrada del mes (KPIs, etiquetas de zona) solo depende de estos ficheros;
+# los CSV de errores tienen su propia huella en la app
+ENTRY_FILES = ("preds", "zones")
+
+
+def month_files(month: str):
+    return {
+        "preds": DATA_PROCESSED / f"lgbm_pred_{month}.parquet",
+        "errors_zone": REPORTS / f"errors_by_zone_{month}.csv",
+        "errors_hour": REPORTS / f"errors_by_hour_{month}.csv",
+        "zones": DATA_RAW / "taxi_zone_lookup.csv",
+    }
+
+
+def fingerprint(path: Path):
+    # Solo stat(): barato y suficiente para saber si el fichero ha cambiado
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def month_fingerprints(month: str):
+    files = month_files(month)
+    return {k: fingerprint(files[k]) for k in ENTRY_FILES}
+
+
+def infer_months():
+    months = {p.stem.replace("lgbm_pred_", "") for p in DATA_PROCESSED.glob("lgbm_pred_*.parquet")}
+    return sorted(months)
+
+
+def build_month_entry(month: str):
+    import pandas as pd
+
+    files = month_files(month)
+    # Huellas antes de leer: si el fichero cambia mientras tanto, la entrada queda "stale"
+    fps = month_fingerprints(month)
+
+    preds = pd.read_parquet(files["preds"], columns=["zone_id", "pickups", "pred"])
+    preds["zone_id"] = preds["zone_id"].astype(int)
+
+    err = preds["pickups"] - preds["pred"]
+    kpis = {
+        "mae": float(err.abs().mean()),
+        "rmse": float((err ** 2).mean() ** 0.5),
+        "rows": int(len(preds)),
+    }
+
+    zones = pd.DataFrame({"zone_id": sorted(preds["zone_id"].unique())})
+    if files["zones"].exists():
+        lookup = pd.read_csv(files["zones"])
+        lookup = lookup.rename(columns={"LocationID": "zone_id", "Zone": "zone_name"})
+        zones = zones.merge(lookup[["zone_id", "Borough", "zone_name"]], on="zone_id", how="left")
+    else:
+        zones["Borough"] = None
+        zones["zone_name"] = None
+
+    zones = zones.sort_values(["Borough", "zone_name", "zone_id"])
+    zone_labels = [
+        [int(r.zone_id), f"{int(r.zone_id)} — {r.Borough} — {r.zone_name}"]
+        for r in zones.itertuples(index=False)
+    ]
+
+    return {"fingerprints": fps, "kpis": kpis, "zones": zone_labels}
+
+
+def is_fresh(entry, fps: dict):
+    return entry is not None and entry.get("fingerprints") == fps
+
+
+def load_manifest(path: Path = MANIFEST_PATH):
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def build_manifest(months=None, path: Path = MANIFEST_PATH):
+    months = months if months is not None else infer_months()
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "months": {m: build_month_entry(m) for m in months},
+    }
+
+    # Escritura atómica: la app nunca ve un JSON a medias
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return manifest
+
+
+def main():
+    manifest = build_manifest()
+    for m, entry in manifest["months"].items():
+        k = entry["kpis"]
+        print(f"[manifest] {m}: zones={len(entry['zones'])} MAE={k['mae']:.3f} RMSE={k['rmse']:.3f}")
+    print("[ok] manifest saved:", MANIFEST_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ MONTH = "2024-01"
 TRIPS_PATH = RAW_DIR / f"yellow_tripdata_{MONTH}.parquet"
 ZONES_PATH = RAW_DIR / "taxi_zone_lookup.csv"
 OUT_PATH = OUT_DIR / f"pickups_zone_hour_{MONTH}.parquet"
+DROPOFFS_PATH = OUT_DIR / f"dropoffs_zone_hour_{MONTH}.parquet"
+OD_PATH = OUT_DIR / f"od_zone_hour_{MONTH}.parquet"
 
 def main():
     print("[load] trips:", TRIPS_PATH)
@@ -39,15 +41,47 @@ def main():
     after = len(trips)
     print(f"[clean] kept {after}/{before} rows ({after/before:.1%})")
 
-    # --- Agregación por hora ---
+    # --- Agregación por hora (una sola pasada sobre los viajes) ---
+    # Agrupamos una vez por (hora PU, hora DO, zona PU, zona DO): el resultado ya es
+    # disperso (solo celdas no nulas) y de ahí salen pickups, dropoffs y el tensor OD
+    # sin volver a recorrer los ~3M viajes.
+    # dropna=False: los viajes sin DOLocationID siguen contando como pickups;
+    # solo se descartan para dropoffs y OD.
     trips["datetime_hour"] = trips["tpep_pickup_datetime"].dt.floor("h")
-    pickups = (
-        trips.groupby(["PULocationID", "datetime_hour"])
+    trips["dropoff_hour"] = trips["tpep_dropoff_datetime"].dt.floor("h")
+    flows = (
+        trips.groupby(["datetime_hour", "dropoff_hour", "PULocationID", "DOLocationID"], dropna=False)
              .size()
+             .reset_index(name="trips")
+    )
+    print("[agg] non-zero (pu_hour, do_hour, pu, do) cells:", len(flows))
+    flows_do = flows.dropna(subset=["DOLocationID"])
+
+    pickups = (
+        flows.groupby(["PULocationID", "datetime_hour"])["trips"]
+             .sum()
              .reset_index(name="pickups")
              .rename(columns={"PULocationID": "zone_id"})
     )
 
+    # Inflow: dropoffs por zona destino y hora de llegada
+    dropoffs = (
+        flows_do.groupby(["DOLocationID", "dropoff_hour"])["trips"]
+             .sum()
+             .reset_index(name="dropoffs")
+             .rename(columns={"DOLocationID": "zone_id", "dropoff_hour": "datetime_hour"})
+             .astype({"zone_id": "int32"})
+    )
+
+    # Tensor OD (hora PU, zona PU, zona DO) en COO, ordenado para leerlo como CSR por hora
+    od = (
+        flows_do.groupby(["datetime_hour", "PULocationID", "DOLocationID"])["trips"]
+             .sum()
+             .reset_index()
+             .rename(columns={"PULocationID": "pu_zone_id", "DOLocationID": "do_zone_id"})
+             .astype({"pu_zone_id": "int16", "do_zone_id": "int16", "trips": "int32"})
+    )
+
     # Join con lookup para borough/zone
     zones = zones.rename(columns={"LocationID": "zone_id", "Zone": "zone_name"})
     pickups = pickups.merge(zones[["zone_id", "Borough", "zone_name"]], on="zone_id", how="left")
@@ -57,6 +91,14 @@ def main():
     print("[save]", OUT_PATH)
     pickups.to_parquet(OUT_PATH, index=False)
 
+    print("[result] dropoff rows:", len(dropoffs), "unique zones:", dropoffs["zone_id"].nunique())
+    print("[save]", DROPOFFS_PATH)
+    dropoffs.to_parquet(DROPOFFS_PATH, index=False)
+
+    print("[result] OD nnz:", len(od), "hours:", od["datetime_hour"].nunique())
+    print("[save]", OD_PATH)
+    od.to_parquet(OD_PATH, index=False)
+
     # Guardamos una nota rápida de EDA
     notes_path = Path("reports/eda_notes.md")
     notes_path.parent.mkdir(parents=True, exist_ok=True)
@@ -66,6 +108,8 @@ def main():
         f.write(f"- Clean rows: {after}\n")
         f.write(f"- Aggregated rows (zone-hour): {len(pickups)}\n")
         f.write(f"- Unique zones: {pickups['zone_id'].nunique()}\n")
+        f.write(f"- Aggregated rows (dropoff zone-hour): {len(dropoffs)}\n")
+        f.write(f"- OD non-zero cells (hour, PU, DO): {len(od)}\n")
     print("[ok] wrote reports/eda_notes.md")
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ import pandas as pd
 MONTH = "2024-01"
 
 IN_PATH = Path("data/processed") / f"pickups_zone_hour_{MONTH}.parquet"
+DROPOFFS_PATH = Path("data/processed") / f"dropoffs_zone_hour_{MONTH}.parquet"
 OUT_DIR = Path("data/processed")
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 OUT_PATH = OUT_DIR / f"features_zone_hour_{MONTH}.parquet"
@@ -35,7 +36,21 @@ def main():
     df["roll_mean_24"] = g_shift.rolling(24).mean().reset_index(level=0, drop=True)
     df["roll_mean_168"] = g_shift.rolling(168).mean().reset_index(level=0, drop=True)
 
-    # 5) Quitamos filas sin historial suficiente (normal perder las primeras horas)
+    # 5) Inflow reciente (dropoffs que llegan a la zona = taxis libres disponibles)
+    # Se une por (zona, hora + k) en vez de shift(): la tabla de pickups no tiene
+    # filas para horas sin pickups, así que un shift por fila no sería "k horas antes".
+    # La tabla de dropoffs es exhaustiva: hora ausente = 0 dropoffs.
+    drop = pd.read_parquet(DROPOFFS_PATH, columns=["zone_id", "datetime_hour", "dropoffs"])
+    drop["datetime_hour"] = pd.to_datetime(drop["datetime_hour"])
+    for k in [1, 2, 3, 24]:
+        shifted = drop.assign(datetime_hour=drop["datetime_hour"] + pd.Timedelta(hours=k))
+        shifted = shifted.rename(columns={"dropoffs": f"inflow_lag_{k}"})
+        df = df.merge(shifted, on=["zone_id", "datetime_hour"], how="left")
+        df[f"inflow_lag_{k}"] = df[f"inflow_lag_{k}"].fillna(0)
+    df["inflow_roll_mean_3"] = df[["inflow_lag_1", "inflow_lag_2", "inflow_lag_3"]].mean(axis=1)
+    df = df.drop(columns=["inflow_lag_2", "inflow_lag_3"])
+
+    # 6) Quitamos filas sin historial suficiente (normal perder las primeras horas)
 
     # Indicadores (opcional, pero útil para que el modelo sepa si ya hay semana)
     df["has_lag_168"] = df["lag_168"].notna().astype(int)
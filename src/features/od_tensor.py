@@ -0,0 +1,113 @@
+"""Tensor origen-destino (hora, zona PU, zona DO) en formato disperso.
+
+En disco es una tabla COO ordenada por (datetime_hour, pu_zone_id, do_zone_id),
+tal como la escribe src/etl/build_pickups_table.py. En memoria se guarda como
+CSR por hora: `indptr[i]:indptr[i+1]` son las entradas de `hours[i]`.
+La memoria escala con el número de celdas no nulas (nnz), nunca con 266² × horas.
+
+Uso:
+    od = ODTensor.load("data/processed/od_zone_hour_2024-01.parquet")
+    week = od.hour_range("2024-01-08", "2024-01-15")
+    jfk = week.origin(132)
+    m = od.matrix("2024-01-08 18:00")   # scipy.sparse.csr_matrix (266 x 266)
+"""
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# LocationID va de 1 a 265: indexamos directamente por id
+N_ZONES = 266
+
+COLUMNS = ["datetime_hour", "pu_zone_id", "do_zone_id", "trips"]
+
+
+class ODTensor:
+    def __init__(self, hours, indptr, pu, do, trips, n_zones=N_ZONES):
+        self.hours = hours
+        self.indptr = indptr
+        self.pu = pu
+        self.do = do
+        self.trips = trips
+        self.n_zones = n_zones
+        self._origin_index = None
+
+    @classmethod
+    def from_frame(cls, df, n_zones=N_ZONES):
+        df = df.sort_values(COLUMNS[:3], kind="stable")
+        dt = pd.to_datetime(df["datetime_hour"]).to_numpy(dtype="datetime64[ns]")
+        hours, starts = np.unique(dt, return_index=True)
+        indptr = np.append(starts, len(dt)).astype(np.int64)
+        return cls(
+            hours=hours,
+            indptr=indptr,
+            pu=df["pu_zone_id"].to_numpy(dtype=np.int16),
+            do=df["do_zone_id"].to_numpy(dtype=np.int16),
+            trips=df["trips"].to_numpy(dtype=np.int32),
+            n_zones=n_zones,
+        )
+
+    @classmethod
+    def load(cls, path, n_zones=N_ZONES):
+        return cls.from_frame(pd.read_parquet(Path(path), columns=COLUMNS), n_zones=n_zones)
+
+    @property
+    def nnz(self):
+        return len(self.trips)
+
+    def to_frame(self):
+        counts = np.diff(self.indptr)
+        return pd.DataFrame({
+            "datetime_hour": np.repeat(self.hours, counts),
+            "pu_zone_id": self.pu,
+            "do_zone_id": self.do,
+            "trips": self.trips,
+        })
+
+    def hour_range(self, start=None, end=None):
+        """Sub-tensor con las horas en [start, end). Las entradas son vistas (sin copiar nnz)."""
+        i0 = 0 if start is None else np.searchsorted(self.hours, np.datetime64(pd.Timestamp(start), "ns"), "left")
+        i1 = len(self.hours) if end is None else np.searchsorted(self.hours, np.datetime64(pd.Timestamp(end), "ns"), "left")
+        i1 = max(i0, i1)
+        a, b = self.indptr[i0], self.indptr[i1]
+        return ODTensor(
+            hours=self.hours[i0:i1],
+            indptr=self.indptr[i0:i1 + 1] - a,
+            pu=self.pu[a:b],
+            do=self.do[a:b],
+            trips=self.trips[a:b],
+            n_zones=self.n_zones,
+        )
+
+    def origin(self, zone_id):
+        """Flujos que salen de `zone_id`: (datetime_hour, do_zone_id, trips) en orden temporal."""
+        if self._origin_index is None:
+            # Orden estable por origen (mantiene el orden temporal) + punteros por zona
+            order = np.argsort(self.pu, kind="stable")
+            ptr = np.searchsorted(self.pu[order], np.arange(self.n_zones + 1), "left")
+            self._origin_index = (order, ptr)
+        order, ptr = self._origin_index
+
+        if not 0 <= zone_id < self.n_zones:
+            raise KeyError(f"zone_id fuera de rango: {zone_id}")
+        rows = order[ptr[zone_id]:ptr[zone_id + 1]]
+        hour_idx = np.searchsorted(self.indptr, rows, "right") - 1
+        return pd.DataFrame({
+            "datetime_hour": self.hours[hour_idx],
+            "do_zone_id": self.do[rows],
+            "trips": self.trips[rows],
+        })
+
+    def matrix(self, hour):
+        """Matriz OD (n_zones x n_zones) de una hora como scipy.sparse.csr_matrix."""
+        from scipy.sparse import csr_matrix
+
+        h = np.datetime64(pd.Timestamp(hour), "ns")
+        i = np.searchsorted(self.hours, h, "left")
+        if i < len(self.hours) and self.hours[i] == h:
+            a, b = self.indptr[i], self.indptr[i + 1]
+        else:
+            a = b = 0
+        return csr_matrix(
+            (self.trips[a:b], (self.pu[a:b], self.do[a:b])),
+            shape=(self.n_zones, self.n_zones),
+        )
@@ -14,7 +14,8 @@ FEATURES = [
     "hour", "day_of_week", "is_weekend", "hour_of_week",
     "lag_1", "lag_2", "lag_24", "lag_168",
     "roll_mean_3", "roll_mean_6", "roll_mean_24", "roll_mean_168",
-    "has_lag_168", "has_roll_168"
+    "has_lag_168", "has_roll_168",
+    "inflow_lag_1", "inflow_lag_24", "inflow_roll_mean_3"
 ]
 
 TARGET = "pickups"